@@ -5,7 +5,7 @@ from autogen_agentchat.base import Response
 from autogen_agentchat.messages import BaseChatMessage, StructuredMessage
 from autogen_core import CancellationToken
 
-from typing import Any, Mapping, Sequence
+from typing import Any, Callable, List, Mapping, Optional, Sequence, Tuple
 from .utils.config import SystemConfig
 from .utils.message_structure import Structure
 from .utils.enums import MessageType
@@ -21,6 +21,9 @@ class BaseAgent(BaseChatAgent):
     Hence, this agent shall also make negotiatons and should be able to bargain.
     """
 
+    # maximum number of inbox messages drained and dispatched together
+    batch_size: int = 64
+
     def __init__(
         self,
         name: str,
@@ -39,7 +42,7 @@ class BaseAgent(BaseChatAgent):
         self.state = {}
         self.message_broker.register_agent(self.name)
 
-        self.logger.info(f"Agent {type(self).__name__} Initialized - {self.name}")
+        self.logger.info("Agent %s Initialized - %s", type(self).__name__, self.name)
 
     @property
     def produced_message_types(self) -> Sequence[type[BaseChatMessage]]:
@@ -50,15 +53,19 @@ class BaseAgent(BaseChatAgent):
         messages: Sequence[BaseChatMessage],
         cancellation_token: CancellationToken,
     ) -> Response:
-        for message in messages:
-            self.logger.debug(
-                f"[{self.name}] on_messages incoming: {repr(message)}, cancellation_token: {cancellation_token}"
-            )
+        if messages and self.logger.isEnabledFor(logging.DEBUG):
+            for message in messages:
+                self.logger.debug(
+                    "[%s] on_messages incoming: %r, cancellation_token: %s",
+                    self.name,
+                    message,
+                    cancellation_token,
+                )
 
         try:
-            self._process_message_queue()
+            await self._process_message_queue()
         except Exception as e:
-            self.logger.exception(f"Error while handling message broker queue: {e}")
+            self.logger.exception("Error while handling message broker queue: %s", e)
 
         content = Structure(message_type=MessageType.RECEIVED)
         reply = StructuredMessage(content=content, source=self.name)
@@ -66,7 +73,9 @@ class BaseAgent(BaseChatAgent):
 
     async def on_reset(self, cancellation_token: CancellationToken) -> None:
         self.logger.info(
-            f"[{self.name} on_reset called with cancellation_token: {cancellation_token}]"
+            "[%s on_reset called with cancellation_token: %s]",
+            self.name,
+            cancellation_token,
         )
         self.state.clear()
 
@@ -74,8 +83,17 @@ class BaseAgent(BaseChatAgent):
         return {"agent_name": self.name, "state": self.state}
 
     async def load_state(self, state: Mapping[str, Any]) -> None:
-        loaded_state = dict(state or {})
-        self.state = loaded_state.get("state", {})
+        self.state = state.get("state", {}) if state else {}
+
+    @staticmethod
+    def _build_dispatch_table(
+        handlers: Mapping[MessageType, Callable[..., None]],
+    ) -> Tuple[Optional[Callable[..., None]], ...]:
+        # a tuple indexed by `MessageType`, with None for unhandled message types
+        table: List[Optional[Callable[..., None]]] = [None] * len(MessageType)
+        for message_type, handler in handlers.items():
+            table[message_type] = handler
+        return tuple(table)
 
     # broker method handling should be defined in the subclass
     def handle_broker_message(self, message: Message) -> None:
@@ -83,15 +101,33 @@ class BaseAgent(BaseChatAgent):
             f"Method `handle_broker_message` not implemented for {type(self).__name__}\nMessage {message} not handled"
         )
 
-    def _process_message_queue(self) -> None:
-        messages = self.message_broker.get_messages(self.name)
-        if not messages:
-            return
-
-        for message in messages:
-            self.handle_broker_message(message)
+    # subclasses may override this to handle a whole bucket of same-typed messages at once
+    def handle_broker_messages_batch(
+        self, buckets: Sequence[Tuple[MessageType, List[Message]]]
+    ) -> None:
+        for _, messages in buckets:
+            for message in messages:
+                self.handle_broker_message(message)
 
-    def send_message(self, message: StructuredMessage, receiver: str) -> None:
+    async def _process_message_queue(self) -> None:
+        # the broker hands over the whole queue at once, handlers may enqueue more meanwhile
+        messages = self.message_broker.get_messages(self.name)
+        while messages:
+            for start in range(0, len(messages), self.batch_size):
+                # consecutive messages of the same type share a bucket, so arrival order is kept
+                buckets: List[Tuple[MessageType, List[Message]]] = []
+                for message in messages[start : start + self.batch_size]:
+                    message_type = message.content.message_type
+                    if buckets and buckets[-1][0] == message_type:
+                        buckets[-1][1].append(message)
+                    else:
+                        buckets.append((message_type, [message]))
+
+                self.handle_broker_messages_batch(buckets)
+
+            messages = self.message_broker.get_messages(self.name)
+
+    def send_message(self, message: Structure, receiver: str) -> None:
         # use receiver="BROADCAST" for broadcast message
 
         broker_message = Message(sender=self.name, receiver=receiver, content=message)
@@ -1,14 +1,12 @@
 import logging
-import uuid
-
-from autogen_agentchat.messages import StructuredMessage
+from secrets import token_hex
 
 from .base_agent import BaseAgent
 from .utils.enums import MessageType
 from .utils.message_structure import Structure, TrafficState
 from .utils.message_broker import Message, MessageBroker
 from .utils.config import SystemConfig
-from typing import Any, Dict
+from typing import Any, Dict, List, Sequence, Tuple
 
 
 class BottleneckAgent(BaseAgent):
@@ -27,6 +25,11 @@ class BottleneckAgent(BaseAgent):
         super(BottleneckAgent, self).__init__(
             name, description, message_broker, logger, config
         )
+
+        # config values read on every message, resolved once
+        self._bottleneck_capacity = config.bottleneck_capacity
+        self._violation_limit = getattr(config, "violation_limit", None)
+
         self.traffic_state = TrafficState(
             current_flow=0,
             capacity_remaining=getattr(config, "capacity", 10),
@@ -34,72 +37,127 @@ class BottleneckAgent(BaseAgent):
             congestion_risk=0.0,
         )
 
+        # running total of `traffic_state.estimated_students`, refreshed by `_set_estimated`
+        self._student_total: int = 0
+
         self.active_negotiations: Dict[str, Dict[str, Any]] = {}
 
+        self._broker_dispatch = self._build_dispatch_table(
+            {
+                MessageType.COMMITMENT_BROADCAST: self.handle_commitment_broadcast,
+                MessageType.VIOLATION_REPORT: self.handle_violation_report,
+                MessageType.TRAFFIC_UPDATE: self.handle_traffic_update,
+            }
+        )
+        self.message_broker.subscribe(
+            self.name,
+            {
+                MessageType.COMMITMENT_BROADCAST,
+                MessageType.VIOLATION_REPORT,
+                MessageType.TRAFFIC_UPDATE,
+            },
+        )
+
     def handle_broker_message(self, message: Message) -> None:
-        structured_msg = message.content
+        structure = message.content
 
-        if structured_msg.content.is_commitment_broadcast():
-            self.handle_commitment_broadcast(structured_msg)
-        elif structured_msg.content.is_violation_report():
-            self.handle_violation_report(structured_msg)
-        elif structured_msg.content.is_traffic_update():
-            self.handle_traffic_update(structured_msg)
+        handler = self._broker_dispatch[structure.message_type]
+        if handler:
+            handler(structure)
 
-    def handle_commitment_broadcast(
-        self, structured_msg: StructuredMessage[Structure]
+    def handle_broker_messages_batch(
+        self, buckets: Sequence[Tuple[MessageType, List[Message]]]
     ) -> None:
-        cb = structured_msg.content.commitment_broadcast
+        for message_type, messages in buckets:
+            if message_type == MessageType.COMMITMENT_BROADCAST:
+                self.handle_commitment_broadcast_batch(messages)
+            else:
+                for message in messages:
+                    self.handle_broker_message(message)
+
+    def handle_commitment_broadcast_batch(self, messages: List[Message]) -> None:
+        negotiation_id = None
+        accepted_commitments = None
+
+        for message in messages:
+            cb = message.content.commitment_broadcast
+            if not cb:
+                continue
+
+            # broadcasts of one round share a negotiation id, so look the bucket up only when it changes
+            current_id = cb.negotiation_id or "unknown"
+            if current_id != negotiation_id:
+                negotiation_id = current_id
+                accepted_commitments = self.active_negotiations.setdefault(
+                    negotiation_id, {"accepted_commitments": []}
+                )["accepted_commitments"]
+
+            accepted_commitments.append(cb.commitment)
+
+    def handle_commitment_broadcast(self, structure: Structure) -> None:
+        cb = structure.commitment_broadcast
         if cb:
             negotiation_id = cb.negotiation_id or "unknown"
-            self.active_negotiations.setdefault(
+            negotiation = self.active_negotiations.setdefault(
                 negotiation_id, {"accepted_commitments": []}
             )
-            self.active_negotiations[negotiation_id]["accepted_commitments"].append(
-                cb.commitment
-            )
+            negotiation["accepted_commitments"].append(cb.commitment)
 
-    def handle_violation_report(
-        self, structured_msg: StructuredMessage[Structure]
-    ) -> None:
-        vr = structured_msg.content.violation_report
+    def handle_violation_report(self, structure: Structure) -> None:
+        vr = structure.violation_report
         if vr:
             self.logger.info(
-                f"[{self.name}] Received violation report from {vr.agent_id}: total violations={vr.violation_count}, details={vr.details}"
+                "[%s] Received violation report from %s: total violations=%d, details=%s",
+                self.name,
+                vr.agent_id,
+                vr.violation_count,
+                vr.details,
             )
 
-            limit = getattr(self.config, "violation_limit", None)
+            limit = self._violation_limit
             if limit and vr.violation_count > limit:
                 self.logger.error(
-                    f"[{self.name}] Agent {vr.agent_id} exceeded violation limit ({vr.violation_count} > {limit})"
+                    "[%s] Agent %s exceeded violation limit (%d > %d)",
+                    self.name,
+                    vr.agent_id,
+                    vr.violation_count,
+                    limit,
                 )
 
-    def handle_traffic_update(self, structured_msg: StructuredMessage[Structure]) -> None:
+    def handle_traffic_update(self, structure: Structure) -> None:
         """Handle traffic state updates from simulation"""
-        if structured_msg.content.traffic_state:
-            self.traffic_state = structured_msg.content.traffic_state
-            self.logger.info(f"[{self.name}] Received traffic update: {self.traffic_state.estimated_students}")
+        if structure.traffic_state:
+            self.traffic_state = structure.traffic_state
+            self._set_estimated(self.traffic_state.estimated_students)
+            self.logger.info(
+                "[%s] Received traffic update: %s",
+                self.name,
+                self.traffic_state.estimated_students,
+            )
         else:
             # Handle alternative format
-            est = structured_msg.content.extra.get("estimated_students", {})
+            est = structure.extra.get("estimated_students", {})
             if isinstance(est, dict):
-                self.traffic_state.estimated_students = est
+                self._set_estimated(est)
 
         # Always recalculate risk and potentially start negotiation
         risk = self.calculate_congestion_risk()
         self.maybe_initiate_negotiation()
 
+    def _set_estimated(self, estimated_students: Dict[str, int]) -> None:
+        self.traffic_state.estimated_students = estimated_students
+        self._student_total = sum(estimated_students.values())
+
     def calculate_congestion_risk(self) -> float:
         """Calculate congestion risk based on current student estimates"""
-        total_students = sum(self.traffic_state.estimated_students.values())
+        total_students = self._student_total
         if total_students == 0:
             self.traffic_state.congestion_risk = 0.0
             return 0.0
 
         # More realistic calculation
-        bottleneck_capacity_per_interval = self.config.bottleneck_capacity
-        clearance_time = self.config.clearance_time
-        
+        bottleneck_capacity_per_interval = self._bottleneck_capacity
+
         # How many intervals needed to clear all students
         intervals_needed = (total_students + bottleneck_capacity_per_interval - 1) // bottleneck_capacity_per_interval
         
@@ -110,40 +168,64 @@ class BottleneckAgent(BaseAgent):
         
         self.traffic_state.congestion_risk = risk
         
-        self.logger.info(f"[{self.name}] Risk calculation: {total_students} students, {intervals_needed} intervals needed, risk={risk:.2f}")
+        self.logger.info(
+            "[%s] Risk calculation: %d students, %d intervals needed, risk=%.2f",
+            self.name,
+            total_students,
+            intervals_needed,
+            risk,
+        )
         
         return risk
 
     def maybe_initiate_negotiation(self) -> None:
         """Decide whether to initiate negotiation based on congestion risk"""
         risk = self.traffic_state.congestion_risk
-        total_students = sum(self.traffic_state.estimated_students.values())
+        total_students = self._student_total
         
         # Lower the threshold for starting negotiations
         if risk >= 0.4 or total_students > 80:  # Start earlier
-            self.logger.info(f"[{self.name}] INITIATING negotiation - Risk: {risk:.2f}, Students: {total_students}")
+            self.logger.info(
+                "[%s] INITIATING negotiation - Risk: %.2f, Students: %d",
+                self.name,
+                risk,
+                total_students,
+            )
             self.start_negotiation_round()
         elif risk > 0.25:
-            self.logger.info(f"[{self.name}] Monitoring situation - Risk: {risk:.2f}, Students: {total_students}")
+            self.logger.info(
+                "[%s] Monitoring situation - Risk: %.2f, Students: %d",
+                self.name,
+                risk,
+                total_students,
+            )
         else:
-            self.logger.info(f"[{self.name}] Low congestion risk - Risk: {risk:.2f}, Students: {total_students}")
+            self.logger.info(
+                "[%s] Low congestion risk - Risk: %.2f, Students: %d",
+                self.name,
+                risk,
+                total_students,
+            )
 
 
     def start_negotiation_round(self) -> None:
         """Start a new negotiation round"""
-        negotiation_id = str(uuid.uuid4())
+        negotiation_id = token_hex(16)
         self.active_negotiations[negotiation_id] = {"accepted_commitments": []}
 
-        self.logger.info(f"[{self.name}] STARTING negotiation round {negotiation_id[:8]}")
-        self.logger.info(f"[{self.name}] Current situation: {dict(self.traffic_state.estimated_students)}")
+        self.logger.info(
+            "[%s] STARTING negotiation round %.8s", self.name, negotiation_id
+        )
+        self.logger.info(
+            "[%s] Current situation: %s",
+            self.name,
+            self.traffic_state.estimated_students,
+        )
 
-        negotiation_struct = Structure(
-            message_type=MessageType.NEGOTIATION_START,
+        negotiation_struct = Structure.model_construct(
+            message_type=MessageType.NEGOTIATION_START.value,
             traffic_state=self.traffic_state,
             negotiation_id=negotiation_id,
         )
 
-        self.send_message(
-            StructuredMessage(content=negotiation_struct, source=self.name),
-            "BROADCAST",
-        )
+        self.send_message(negotiation_struct, "BROADCAST")
@@ -1,35 +1,32 @@
 from dataclasses import dataclass
 import logging
-import uuid
-from collections import defaultdict
+from collections import deque
 from datetime import datetime, timedelta
+from itertools import accumulate, count, repeat
 
-from autogen_agentchat.messages import StructuredMessage
 from .utils.message_structure import (
     Commitment,
     CommitmentProposalContent,
     CommitmentResponseContent,
-    CommitmentBroadcastContent,  # <- ADD this line
+    CommitmentBroadcastContent,
     Structure,
     TrafficState,
 )
 
 from .base_agent import BaseAgent
-from .utils.enums import CommitmentType, MessageType
+from .utils.enums import CommitmentStatus, CommitmentType, MessageType
 from .utils.message_broker import Message, MessageBroker
-from .utils.message_structure import (
-    Commitment,
-    CommitmentProposalContent,
-    CommitmentResponseContent,
-    Structure,
-    TrafficState,
-)
 from .utils.config import SystemConfig
+from .utils.scoring import adjustment_score, obligation_factor, proposal_benefit
+
+from typing import Deque, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
-from typing import List, Optional
+_ONE_MINUTE = timedelta(minutes=1)
+_TWO_MINUTES = timedelta(minutes=2)
+_ONE_HOUR = timedelta(hours=1)
 
 
-@dataclass
+@dataclass(slots=True)
 class ClassroomState:
     agent_name: str
     current_attendance: int
@@ -61,196 +58,293 @@ class ClassroomAgent(BaseAgent):
             agent_name=self.name,
             current_attendance=attendance,
             prof_flexibility=prof_flexibility,
-            end_time=datetime.now() + timedelta(hours=1),
+            end_time=datetime.now() + _ONE_HOUR,
             exit_slots=[],
         )
 
-        self.commitment_history = []
-        self.pending_commitments = []
+        # loop invariants of `get_adjustment_score`
+        self._inv_max_adj = 1.0 / config.max_adjustment
+        self._obligation_factor = 1.0
+
+        # the full history backs the simulation statistics, so only the pending queue is bounded
+        self.commitment_history: List[Commitment] = []
+        self.pending_commitments: Deque[Commitment] = deque(maxlen=256)
         self.obligation_credits = 0
         self.violation_count = 0
-        self.trust_scores = defaultdict(lambda: 0.5)
+        # agents we have no history with are trusted at 0.5
+        self.trust_scores: Dict[str, float] = {}
 
         self.current_negotiation = None
         self.received_proposals = []
+        # commitment ids only need to be unique within the process, agent names already are
+        self._id_counter = count()
+        # commitment ids already evaluated this round, duplicates are not scored again
+        self._seen_commitments: Set[str] = set()
+
+        # per-agent commitment prototypes, proposals only fill in the id and adjustment
+        self._commitment_templates: Dict[CommitmentType, Commitment] = {
+            commitment_type: Commitment.model_construct(
+                id="",
+                proposer=self.name,
+                accepter="OPEN",
+                commitment_type=commitment_type.value,
+                reciprocal_obligation=reciprocal_obligation,
+                priority=priority,
+            )
+            for _, commitment_type, reciprocal_obligation, priority, _, _ in (
+                self._PROPOSAL_TEMPLATES
+            )
+        }
+
+        self._broker_dispatch = self._build_dispatch_table(
+            {
+                MessageType.NEGOTIATION_START: self._handle_negotiation_start,
+                MessageType.COMMITMENT_PROPOSAL: self._handle_commitment_proposal,
+                MessageType.COMMITMENT_RESPONSE: self._handle_commitment_response,
+            }
+        )
+        # broadcasts of any other type would be dropped by the dispatch table anyway
+        self.message_broker.subscribe(
+            self.name,
+            {
+                MessageType.NEGOTIATION_START,
+                MessageType.COMMITMENT_PROPOSAL,
+                MessageType.COMMITMENT_RESPONSE,
+            },
+        )
+
+    @property
+    def obligation_credits(self) -> int:
+        return self._obligation_credits
+
+    @obligation_credits.setter
+    def obligation_credits(self, value: int) -> None:
+        # the obligation factor only changes with the credits, so refresh it here
+        self._obligation_credits = value
+        self._obligation_factor = obligation_factor(value)
 
     # how willing is an agent to adjust its schedule
     def get_adjustment_score(self, minutes: int) -> float:
-        flexibility = self.state.prof_flexibility
+        return adjustment_score(
+            self.state.prof_flexibility,
+            minutes,
+            self._inv_max_adj,
+            self._obligation_factor,
+        )
+
+    # early exit offers in minutes, ascending
+    _EARLY_EXIT_CANDIDATES = (2, 4, 6)
+
+    def _early_exit_adjustment(
+        self, our_proportion: float, our_students: int, risk: float
+    ) -> Optional[int]:
+        # Strategy 1: If we have few students and high risk, offer to exit early
+        if our_proportion < 0.4 and risk > 0.5:
+            # the adjustment score never increases with |minutes|, so if the smallest
+            # candidate is not acceptable none of the larger ones are either
+            adjustment = self._EARLY_EXIT_CANDIDATES[0]
+            if self.get_adjustment_score(-adjustment) > 0.5:
+                return adjustment  # Only propose one early exit option
+        return None
+
+    def _staggered_exit_adjustment(
+        self, our_proportion: float, our_students: int, risk: float
+    ) -> Optional[int]:
+        # Strategy 2: If we have many students, offer staggered exit
+        if our_proportion > 0.4 and our_students > 30:
+            return 0  # No time change, just batching
+        return None
+
+    def _late_exit_adjustment(
+        self, our_proportion: float, our_students: int, risk: float
+    ) -> Optional[int]:
+        # Strategy 3: If we owe obligations, offer to extend
+        if self.obligation_credits < 0:  # We owe favors
+            extend_minutes = min(4, abs(self.obligation_credits) * 2)
+            if self.get_adjustment_score(extend_minutes) > 0.4:
+                return extend_minutes
+        return None
+
+    # (strategy, commitment_type, reciprocal_obligation, priority, reason, log format)
+    # a strategy returns the adjustment in minutes, or None when it does not apply.
+    # the reason goes into the proposal, the log format takes name, adjustment and students
+    _PROPOSAL_TEMPLATES = (
+        (
+            _early_exit_adjustment,
+            CommitmentType.EARLY_EXIT,
+            True,
+            1,
+            "Offering to exit {adjustment} min early to reduce congestion",
+            "[%(name)s] Proposing EARLY_EXIT: %(adjustment)d minutes",
+        ),
+        (
+            _staggered_exit_adjustment,
+            CommitmentType.STAGGERED_EXIT,
+            False,
+            2,
+            "Offering staggered exit for {students} students",
+            "[%(name)s] Proposing STAGGERED_EXIT for %(students)d students",
+        ),
+        (
+            _late_exit_adjustment,
+            CommitmentType.LATE_EXIT,
+            False,
+            3,
+            "Fulfilling obligation by extending {adjustment} minutes",
+            "[%(name)s] Proposing LATE_EXIT: %(adjustment)d minutes (obligation)",
+        ),
+    )
+
+    def _build_proposal(
+        self,
+        commitment_type: CommitmentType,
+        adjustment: int,
+        negotiation_id: str,
+        student_count: int,
+        reason: str,
+        timestamp: datetime,
+    ) -> Message:
+        commitment = self._commitment_templates[commitment_type].model_copy(
+            update={
+                "id": f"{self.name}-{next(self._id_counter)}",
+                "adjustment_minutes": adjustment,
+                "timestamp": timestamp,
+            }
+        )
 
-        adjustment_factor = 1 - (abs(minutes) / self.config.max_adjustment)
-        obligation_factor = 1 - 0.1 * self.obligation_credits
-        obligation_factor = max(0.5, min(1.5, obligation_factor))
+        proposal_content = CommitmentProposalContent.model_construct(
+            commitment=commitment,
+            negotiation_id=negotiation_id,
+            student_count=student_count,
+            reason=reason,
+        )
+
+        commitment_structure = Structure.model_construct(
+            message_type=MessageType.COMMITMENT_PROPOSAL.value,
+            commitment_proposal=proposal_content,
+        )
 
-        score = flexibility * adjustment_factor * obligation_factor
-        return max(0, min(1.0, score))
+        return Message(
+            sender=self.name, receiver="BROADCAST", content=commitment_structure
+        )
 
-    def generate_commitment_proposals(
+    def iter_commitment_proposals(
         self, traffic_state: TrafficState, negotiation_id: str
-    ) -> List[Message]:
-        """Generate commitment proposals based on current traffic situation"""
-        proposals = []
-        
+    ) -> Iterator[Message]:
+        """Yield commitment proposals based on current traffic situation"""
+        risk = traffic_state.congestion_risk
         # Don't propose if congestion risk is low
-        if traffic_state.congestion_risk < 0.3:
-            return proposals
+        if risk < 0.3:
+            return
+
+        our_students = traffic_state.estimated_students.get(self.name, 0)
+        # without high risk, a large class or owed favors no strategy can apply,
+        # so the proportion (a sum over every classroom) is not needed
+        if risk <= 0.5 and our_students <= 30 and self.obligation_credits >= 0:
+            return
 
         total_students = sum(traffic_state.estimated_students.values())
         if total_students == 0:
-            return proposals
+            return
+        our_proportion = our_students / total_students
 
-        our_students = traffic_state.estimated_students.get(self.name, 0)
-        our_proportion = our_students / total_students if total_students > 0 else 0
+        self.logger.info(
+            "[%s] Generating proposals - Risk: %.2f, Our students: %d",
+            self.name,
+            risk,
+            our_students,
+        )
 
-        self.logger.info(f"[{self.name}] Generating proposals - Risk: {traffic_state.congestion_risk:.2f}, Our students: {our_students}")
+        # proposals of one round share a timestamp
+        now = datetime.now()
+        for strategy, commitment_type, _, _, reason, log_format in (
+            self._PROPOSAL_TEMPLATES
+        ):
+            adjustment = strategy(self, our_proportion, our_students, risk)
+            if adjustment is None:
+                continue
+
+            self.logger.info(
+                log_format,
+                {"name": self.name, "adjustment": adjustment, "students": our_students},
+            )
 
-        # Strategy 1: If we have few students and high risk, offer to exit early
-        if our_proportion < 0.4 and traffic_state.congestion_risk > 0.5:
-            for adjustment in [2, 4, 6]:
-                if self.get_adjustment_score(-adjustment) > 0.5:
-                    commitment = Commitment(
-                        id=str(uuid.uuid4()),
-                        proposer=self.name,
-                        accepter="OPEN",
-                        commitment_type=CommitmentType.EARLY_EXIT,
-                        adjustment_minutes=adjustment,
-                        reciprocal_obligation=True,
-                        priority=1,
-                    )
-                    
-                    proposal_content = CommitmentProposalContent(
-                        commitment=commitment,
-                        negotiation_id=negotiation_id,
-                        student_count=our_students,
-                        reason=f"Offering to exit {adjustment} min early to reduce congestion"
-                    )
-                    
-                    commitment_structure = Structure(
-                        message_type=MessageType.COMMITMENT_PROPOSAL,
-                        commitment_proposal=proposal_content,
-                    )
-                    content = StructuredMessage(content=commitment_structure, source=self.name)
-                    
-                    proposal = Message(sender=self.name, receiver="BROADCAST", content=content)
-                    proposals.append(proposal)
-                    
-                    self.logger.info(f"[{self.name}] Proposing EARLY_EXIT: {adjustment} minutes")
-                    break  # Only propose one early exit option
+            reason = reason.format(adjustment=adjustment, students=our_students)
 
-        # Strategy 2: If we have many students, offer staggered exit
-        elif our_proportion > 0.4 and our_students > 30:
-            commitment = Commitment(
-                id=str(uuid.uuid4()),
-                proposer=self.name,
-                accepter="OPEN",
-                commitment_type=CommitmentType.STAGGERED_EXIT,
-                adjustment_minutes=0,  # No time change, just batching
-                reciprocal_obligation=False,
-                priority=2,
+            yield self._build_proposal(
+                commitment_type, adjustment, negotiation_id, our_students, reason, now
             )
-            
-            proposal_content = CommitmentProposalContent(
-                commitment=commitment,
-                negotiation_id=negotiation_id,
-                student_count=our_students,
-                reason=f"Offering staggered exit for {our_students} students"
-            )
-            
-            commitment_structure = Structure(
-                message_type=MessageType.COMMITMENT_PROPOSAL,
-                commitment_proposal=proposal_content,
-            )
-            content = StructuredMessage(content=commitment_structure, source=self.name)
-            
-            proposal = Message(sender=self.name, receiver="BROADCAST", content=content)
-            proposals.append(proposal)
-            
-            self.logger.info(f"[{self.name}] Proposing STAGGERED_EXIT for {our_students} students")
-
-        # Strategy 3: If we owe obligations, offer to extend
-        if self.obligation_credits < 0:  # We owe favors
-            extend_minutes = min(4, abs(self.obligation_credits) * 2)
-            if self.get_adjustment_score(extend_minutes) > 0.4:
-                commitment = Commitment(
-                    id=str(uuid.uuid4()),
-                    proposer=self.name,
-                    accepter="OPEN",
-                    commitment_type=CommitmentType.LATE_EXIT,
-                    adjustment_minutes=extend_minutes,
-                    reciprocal_obligation=False,
-                    priority=3,
-                )
-                
-                proposal_content = CommitmentProposalContent(
-                    commitment=commitment,
-                    negotiation_id=negotiation_id,
-                    student_count=our_students,
-                    reason=f"Fulfilling obligation by extending {extend_minutes} minutes"
-                )
-                
-                commitment_structure = Structure(
-                    message_type=MessageType.COMMITMENT_PROPOSAL,
-                    commitment_proposal=proposal_content,
-                )
-                content = StructuredMessage(content=commitment_structure, source=self.name)
-                
-                proposal = Message(sender=self.name, receiver="BROADCAST", content=content)
-                proposals.append(proposal)
-                
-                self.logger.info(f"[{self.name}] Proposing LATE_EXIT: {extend_minutes} minutes (obligation)")
-
-        return proposals
 
     def exec_commitment(self, commitment: Commitment) -> bool:
         if commitment.commitment_type == CommitmentType.EARLY_EXIT:
-            self.state.end_time -= timedelta(minutes=commitment.adjustment_minutes)
+            self.state.end_time -= _ONE_MINUTE * commitment.adjustment_minutes
 
         elif commitment.commitment_type == CommitmentType.LATE_EXIT:
-            self.state.end_time += timedelta(minutes=commitment.adjustment_minutes)
+            self.state.end_time += _ONE_MINUTE * commitment.adjustment_minutes
 
         elif commitment.commitment_type == CommitmentType.STAGGERED_EXIT:
             base_time = self.state.end_time
-            students_per_batch = min(30, self.state.current_attendance // 3)
-
-            self.state.exit_slots = []
-            for i in range(0, self.state.current_attendance, students_per_batch):
-                exit_time = base_time + timedelta(minutes=i // students_per_batch * 2)
-                self.state.exit_slots.append(exit_time)
+            # classes smaller than 3 students would otherwise get an empty batch size
+            students_per_batch = max(1, min(30, self.state.current_attendance // 3))
+            n_batches = -(-self.state.current_attendance // students_per_batch)
+
+            # slots are two minutes apart, accumulated in C rather than multiplied per slot
+            self.state.exit_slots = (
+                list(accumulate(repeat(_TWO_MINUTES, n_batches - 1), initial=base_time))
+                if n_batches
+                else []
+            )
 
-        commitment.status = "fulfilled"
+        commitment.status = CommitmentStatus.FULFILLED.value
         self.commitment_history.append(commitment)
 
         return True
 
     def handle_broker_message(self, message: Message) -> None:
-        message_type = message.content.content.message_type
-
-        if message_type == MessageType.NEGOTIATION_START:
-            self._handle_negotiation_start(message)
-        elif message_type == MessageType.COMMITMENT_PROPOSAL:
-            self._handle_commitment_proposal(message)
-        elif message_type == MessageType.COMMITMENT_RESPONSE:
-            self._handle_commitment_response(message)
-
-    def _evaluate_commitment_proposal(
-        self, message: StructuredMessage[Structure]
-    ) -> Optional[Message]:
+        handler = self._broker_dispatch[message.content.message_type]
+        if handler:
+            handler(message)
+
+    def handle_broker_messages_batch(
+        self, buckets: Sequence[Tuple[MessageType, List[Message]]]
+    ) -> None:
+        for message_type, messages in buckets:
+            if message_type == MessageType.COMMITMENT_PROPOSAL:
+                self._handle_commitment_proposal_batch(messages)
+            else:
+                for message in messages:
+                    self.handle_broker_message(message)
+
+    def _evaluate_commitment_proposal(self, structure: Structure) -> Optional[Message]:
         """Evaluate received commitment proposal and decide whether to accept"""
-        proposal = message.content.commitment_proposal
+        proposal = structure.commitment_proposal
         if proposal is None:
             return None
 
         commitment = proposal.commitment
         proposer = commitment.proposer
+        commitment_type = commitment.commitment_type
         
         # Don't evaluate our own proposals
         if proposer == self.name:
             return None
 
-        self.logger.info(f"[{self.name}] Evaluating proposal from {proposer}: {commitment.commitment_type} ({commitment.adjustment_minutes} min)")
+        if commitment.id in self._seen_commitments:
+            return None
+        self._seen_commitments.add(commitment.id)
+
+        # the enum lookup for the type name would run even with INFO disabled
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(
+                "[%s] Evaluating proposal from %s: %s (%d min)",
+                self.name,
+                proposer,
+                CommitmentType(commitment_type).name,
+                commitment.adjustment_minutes,
+            )
 
         # Calculate benefit score
-        trust_score = self.trust_scores[proposer]
+        trust_score = self.trust_scores.get(proposer, 0.5)
         benefit = self._compute_proposal_benefit(commitment)
         obligation_cost = -0.3 if commitment.reciprocal_obligation else 0.0
         
@@ -258,31 +352,39 @@ class ClassroomAgent(BaseAgent):
         our_students = self.state.current_attendance
         situation_bonus = 0.0
         
-        if commitment.commitment_type == CommitmentType.EARLY_EXIT:
+        if commitment_type == CommitmentType.EARLY_EXIT:
             # Accept if we have many students and they're reducing load
             if our_students > 35:
                 situation_bonus = 0.4
-        elif commitment.commitment_type == CommitmentType.LATE_EXIT:
+        elif commitment_type == CommitmentType.LATE_EXIT:
             # Accept if we have few students
             if our_students < 25:
                 situation_bonus = 0.3
 
         total_score = trust_score + benefit + obligation_cost + situation_bonus
         
-        self.logger.info(f"[{self.name}] Evaluation score: {total_score:.2f} (trust:{trust_score:.2f}, benefit:{benefit:.2f}, obligation:{obligation_cost:.2f}, situation:{situation_bonus:.2f})")
+        self.logger.info(
+            "[%s] Evaluation score: %.2f (trust:%.2f, benefit:%.2f, obligation:%.2f, situation:%.2f)",
+            self.name,
+            total_score,
+            trust_score,
+            benefit,
+            obligation_cost,
+            situation_bonus,
+        )
 
         # Accept if score is good enough
         if total_score > 0.6:
             # Create acceptance
-            accepted_commitment = Commitment(
+            accepted_commitment = Commitment.model_construct(
                 id=commitment.id,
                 proposer=commitment.proposer,
                 accepter=self.name,
-                commitment_type=commitment.commitment_type,
+                commitment_type=commitment_type,
                 adjustment_minutes=commitment.adjustment_minutes,
                 reciprocal_obligation=commitment.reciprocal_obligation,
                 priority=commitment.priority,
-                status="accepted"
+                status=CommitmentStatus.ACCEPTED.value,
             )
             
             # Add to our pending commitments
@@ -292,100 +394,103 @@ class ClassroomAgent(BaseAgent):
             if commitment.reciprocal_obligation:
                 self.obligation_credits += 1  # We now owe a favor
             
-            commitment_response = CommitmentResponseContent(
+            commitment_response = CommitmentResponseContent.model_construct(
                 commitment=accepted_commitment,
                 decision="accept",
                 decision_score=total_score,
-                negotiation_id=message.content.negotiation_id,
+                negotiation_id=structure.negotiation_id,
                 accepter_students=self.state.current_attendance,
                 acceptance_reason=f"Beneficial arrangement (score: {total_score:.2f})"
             )
             
-            content = Structure(
-                message_type=MessageType.COMMITMENT_RESPONSE,
+            content = Structure.model_construct(
+                message_type=MessageType.COMMITMENT_RESPONSE.value,
                 commitment_response=commitment_response,
             )
-            response_content = StructuredMessage(content=content, source=self.name)
-            response = Message(
-                sender=self.name, receiver=proposer, content=response_content
-            )
+            response = Message(sender=self.name, receiver=proposer, content=content)
             
-            self.logger.info(f"[{self.name}] ACCEPTING proposal from {proposer}")
+            self.logger.info("[%s] ACCEPTING proposal from %s", self.name, proposer)
             return response
         else:
-            self.logger.info(f"[{self.name}] REJECTING proposal from {proposer} (score too low)")
+            self.logger.info(
+                "[%s] REJECTING proposal from %s (score too low)", self.name, proposer
+            )
             return None
     
     def _compute_proposal_benefit(self, commitment: Commitment) -> float:
-        benefit = 0.0
-
-        if commitment.commitment_type == CommitmentType.EARLY_EXIT:
-            if self.state.current_attendance > 30:
-                benefit = 0.6
-            else:
-                benefit = 0.3
-
-        elif commitment.commitment_type == CommitmentType.STAGGERED_EXIT:
-            benefit = 0.4
-
-        elif commitment.commitment_type == CommitmentType.LATE_EXIT:
-            if self.obligation_credits > 0:
-                benefit = 0.5
-            else:
-                benefit = 0.1
-
-        return benefit
+        return proposal_benefit(
+            commitment.commitment_type,
+            self.state.current_attendance,
+            self._obligation_credits,
+        )
 
     def _handle_negotiation_start(self, message: Message) -> None:
         """Handle start of negotiation round"""
-        structured_message = message.content
-        content = structured_message.content
+        structure = message.content
+        negotiation_id = structure.negotiation_id
+        traffic_state = structure.traffic_state
 
-        if content.negotiation_id is None or content.traffic_state is None:
+        if negotiation_id is None or traffic_state is None:
             return
 
-        negotiation_id = content.negotiation_id
-        traffic_state = content.traffic_state
-
-        self.logger.info(f"[{self.name}] Starting negotiation {negotiation_id[:8]} - Risk: {traffic_state.congestion_risk:.2f}")
+        self.logger.info(
+            "[%s] Starting negotiation %.8s - Risk: %.2f",
+            self.name,
+            negotiation_id,
+            traffic_state.congestion_risk,
+        )
         
         self.current_negotiation = negotiation_id
         self.received_proposals = []
+        self._seen_commitments.clear()
 
-        # Generate our proposals
-        proposals = self.generate_commitment_proposals(traffic_state, negotiation_id)
-
-        # Send all proposals
-        for proposal in proposals:
+        # Send each of our proposals as soon as it is built
+        proposed = False
+        for proposal in self.iter_commitment_proposals(traffic_state, negotiation_id):
             self.message_broker.send_message(proposal)
+            proposed = True
 
-        if not proposals:
-            self.logger.info(f"[{self.name}] No proposals to make this round")
+        if not proposed:
+            self.logger.info("[%s] No proposals to make this round", self.name)
 
     def _handle_commitment_proposal(self, message: Message) -> None:
         self.received_proposals.append(message)
-        structured_message = message.content
-
-        response = self._evaluate_commitment_proposal(structured_message)
+        response = self._evaluate_commitment_proposal(message.content)
         if response:
             self.message_broker.send_message(response)
 
+    def _handle_commitment_proposal_batch(self, messages: List[Message]) -> None:
+        # evaluations never read the broker, so the responses can be sent together
+        self.received_proposals.extend(messages)
+        responses = []
+        for message in messages:
+            response = self._evaluate_commitment_proposal(message.content)
+            if response:
+                responses.append(response)
+
+        if responses:
+            self.message_broker.send_messages(responses)
+
     def _handle_commitment_response(self, message: Message) -> None:
         """Handle response to our commitment proposal"""
-        structured_message = message.content
-        response = structured_message.content.commitment_response
+        response = message.content.commitment_response
         
         if response is None:
             return
             
         if response.decision == "accept":
-            acceptor = structured_message.source
+            acceptor = message.sender
             commitment = response.commitment
             
-            self.logger.info(f"[{self.name}] SUCCESS! {acceptor} accepted our {commitment.commitment_type} proposal")
+            self.logger.info(
+                "[%s] SUCCESS! %s accepted our %s proposal",
+                self.name,
+                acceptor,
+                CommitmentType(commitment.commitment_type).name,
+            )
             
             # Add to our history
-            commitment.status = "accepted"
+            commitment.status = CommitmentStatus.ACCEPTED.value
             self.commitment_history.append(commitment)
             
             # Update obligation credits
@@ -393,7 +498,7 @@ class ClassroomAgent(BaseAgent):
                 self.obligation_credits -= 1  # They owe us now
             
             # Broadcast the successful deal
-            broadcast_content = CommitmentBroadcastContent(
+            broadcast_content = CommitmentBroadcastContent.model_construct(
                 proposer=self.name,
                 accepter=acceptor,
                 commitment=commitment,
@@ -402,20 +507,18 @@ class ClassroomAgent(BaseAgent):
                 accepter_students=response.accepter_students
             )
             
-            broadcast_struct = Structure(
-                message_type=MessageType.COMMITMENT_BROADCAST,
+            broadcast_struct = Structure.model_construct(
+                message_type=MessageType.COMMITMENT_BROADCAST.value,
                 commitment_broadcast=broadcast_content,
             )
-            broadcast_msg = StructuredMessage(content=broadcast_struct, source=self.name)
-            
-            self.send_message(broadcast_msg, "BROADCAST")
+            self.send_message(broadcast_struct, "BROADCAST")
             
         else:
-            self.logger.info(f"[{self.name}] Proposal rejected by {structured_message.source}")
+            self.logger.info(
+                "[%s] Proposal rejected by %s", self.name, message.sender
+            )
 
 
     def update_trust_score(self, agent_name: str, fulfilled: bool) -> None:
-        self.trust_scores[agent_name] += 0.1 * int(fulfilled) - 0.2 * (
-            1 - int(fulfilled)
-        )
-        self.trust_scores[agent_name] = max(0, min(1.0, self.trust_scores[agent_name]))
+        score = self.trust_scores.get(agent_name, 0.5) + (0.1 if fulfilled else -0.2)
+        self.trust_scores[agent_name] = max(0.0, min(1.0, score))
@@ -1,7 +1,8 @@
-from typing import NamedTuple
+from dataclasses import dataclass
 
 
-class SystemConfig(NamedTuple):
+@dataclass(frozen=True, slots=True)
+class SystemConfig:
     bottleneck_capacity: int = 50
     clearance_time: int = 2
     batch_spacing: int = 2
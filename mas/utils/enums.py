@@ -1,19 +1,29 @@
-from enum import Enum
+from enum import IntEnum
 
 
-class MessageType(str, Enum):
-    TRAFFIC_UPDATE = "TRAFFIC_UPDATE"
-    NEGOTIATION_START = "NEGOTIATION_START"
-    COMMITMENT_PROPOSAL = "COMMITMENT_PROPOSAL"
-    COMMITMENT_RESPONSE = "COMMITMENT_RESPONSE"
-    COMMITMENT_BROADCAST = "COMMITMENT_BROADCAST"
-    VIOLATION_REPORT = "VIOLATION_REPORT"
-    OTHER = "OTHER"
-    RECEIVED = "RECIEVED"
+# small contiguous values, so agents can index dispatch tables by message type
+class MessageType(IntEnum):
+    TRAFFIC_UPDATE = 0
+    NEGOTIATION_START = 1
+    COMMITMENT_PROPOSAL = 2
+    COMMITMENT_RESPONSE = 3
+    COMMITMENT_BROADCAST = 4
+    VIOLATION_REPORT = 5
+    OTHER = 6
+    RECEIVED = 7
 
 
-class CommitmentType(str, Enum):
-    EARLY_EXIT = "EARLY_EXIT"
-    LATE_EXIT = "LATE_EXIT"
-    STAGGERED_EXIT = "STAGGERED_EXIT"
-    CUSTOM = "CUSTOM"
+# stored as raw ints on commitments, so comparisons are plain int equality
+class CommitmentType(IntEnum):
+    EARLY_EXIT = 0
+    LATE_EXIT = 1
+    STAGGERED_EXIT = 2
+    CUSTOM = 3
+
+
+# stored as raw ints on commitments, like `CommitmentType`
+class CommitmentStatus(IntEnum):
+    PROPOSED = 0
+    ACCEPTED = 1
+    FULFILLED = 2
+    VIOLATED = 3
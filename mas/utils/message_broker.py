@@ -1,58 +1,139 @@
-import queue
 import threading
 
-from autogen_agentchat.messages import StructuredMessage
-from collections import defaultdict
-from typing import List, NamedTuple
+from collections import defaultdict, deque
+from itertools import islice
+from typing import (
+    AbstractSet,
+    DefaultDict,
+    Deque,
+    Dict,
+    FrozenSet,
+    List,
+    NamedTuple,
+    Sequence,
+)
 
+from .enums import MessageType
 from .message_structure import Structure
 
 
 class Message(NamedTuple):
+    # internal broker envelope, the autogen `StructuredMessage` is only built at the agent boundary
     sender: str
     receiver: str
-    content: StructuredMessage[Structure]
+    content: Structure
 
 
 class MessageBroker:
     """Central message broker for agentic communication"""
 
     def __init__(self) -> None:
-        # a queue for messages recieved by each agent
-        self.message_queues = defaultdict(queue.Queue)
+        # a queue for messages recieved by each agent, each guarded by its own lock
+        self.message_queues: DefaultDict[str, Deque[Message]] = defaultdict(deque)
+        self.locks: DefaultDict[str, threading.Lock] = defaultdict(threading.Lock)
 
         self.agents = set()
-        self.message_history: List[Message] = []
+        # deque appends are atomic, so the history is recorded outside the lock
+        self.message_history: Deque[Message] = deque()
 
-        # a lock to prevent race conditions
+        # broadcasts are stored once, each agent reads them through its own cursor.
+        # cursors are absolute positions, `_broadcast_offset` is the position of `_broadcast_log[0]`
+        self._broadcast_log: Deque[Message] = deque()
+        self._broadcast_offset = 0
+        self._broadcast_cursors: Dict[str, int] = {}
+
+        # broadcast types each agent subscribed to, agents that never subscribe receive every broadcast
+        self._agent_topics: Dict[str, FrozenSet[MessageType]] = {}
+
+        # guards the broadcast log and the per-agent cursors into it
         self.lock = threading.Lock()
 
     def register_agent(self, agent_name: str) -> None:
         with self.lock:
             self.agents.add(agent_name)
-            if agent_name not in self.message_queues:
-                self.message_queues[agent_name] = queue.Queue()
+            # agents only see broadcasts sent after they registered
+            self._broadcast_cursors.setdefault(
+                agent_name, self._broadcast_offset + len(self._broadcast_log)
+            )
+            self.message_queues[agent_name]
+            self.locks[agent_name]
+
+    def subscribe(self, agent_name: str, message_types: AbstractSet[MessageType]) -> None:
+        with self.lock:
+            self._agent_topics[agent_name] = frozenset(message_types)
 
     def send_message(self, message: Message) -> None:
+        self.message_history.append(message)
+
+        with self.lock:
+            self._send_message(message)
+
+    def send_messages(self, messages: Sequence[Message]) -> None:
+        # same as `send_message` for each message, but takes the broker lock once
+        self.message_history.extend(messages)
+
         with self.lock:
-            self.message_history.append(message)
+            for message in messages:
+                self._send_message(message)
 
-            if message.receiver == "BROADCAST":
-                for agent in self.agents:
-                    if agent != message.sender:
-                        self.message_queues[agent].put(message)
+    def _send_message(self, message: Message) -> None:
+        # the broker lock must be held
+        if message.receiver == "BROADCAST":
+            self._broadcast_log.append(message)
+        else:
+            # earlier broadcasts must reach the receiver before this message does
+            self._deliver_broadcasts(message.receiver)
+            with self.locks[message.receiver]:
+                self.message_queues[message.receiver].append(message)
+
+    def deliver_broadcasts(self, agent: str) -> None:
+        with self.lock:
+            self._deliver_broadcasts(agent)
+
+    def _deliver_broadcasts(self, agent: str) -> None:
+        # moves unread broadcasts into the agent's queue, the broker lock must be held
+        cursor = self._broadcast_cursors.get(agent)
+        end = self._broadcast_offset + len(self._broadcast_log)
+        if cursor is None or cursor == end:
+            return
+
+        unread = islice(self._broadcast_log, cursor - self._broadcast_offset, None)
+        topics = self._agent_topics.get(agent)
+        with self.locks[agent]:
+            if topics is None:
+                self.message_queues[agent].extend(
+                    message for message in unread if message.sender != agent
+                )
             else:
-                self.message_queues[message.receiver].put(message)
+                self.message_queues[agent].extend(
+                    message
+                    for message in unread
+                    if message.sender != agent
+                    and message.content.message_type in topics
+                )
+        self._broadcast_cursors[agent] = end
+
+        # drop broadcasts every agent has already read
+        oldest = min(self._broadcast_cursors.values())
+        while self._broadcast_offset < oldest:
+            self._broadcast_log.popleft()
+            self._broadcast_offset += 1
+
+    def is_idle(self) -> bool:
+        # True when no agent has queued messages or unread broadcasts
+        with self.lock:
+            end = self._broadcast_offset + len(self._broadcast_log)
+            if any(cursor != end for cursor in self._broadcast_cursors.values()):
+                return False
+            return not any(self.message_queues.values())
 
     def get_messages(self, agent: str) -> List[Message]:
-        messages = []
-        agent_queue = self.message_queues[agent]
-
-        while not agent_queue.empty():
-            try:
-                message = agent_queue.get_nowait()
-                messages.append(message)
-            except queue.Empty:
-                break
+        self.deliver_broadcasts(agent)
+
+        # drain the whole queue under a single lock acquisition
+        with self.locks[agent]:
+            agent_queue = self.message_queues[agent]
+            messages = list(agent_queue)
+            agent_queue.clear()
 
         return messages
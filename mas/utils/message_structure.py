@@ -1,9 +1,13 @@
 from __future__ import annotations
 from datetime import datetime
-from typing import Dict, Literal, Optional, Any
+from itertools import count
+from typing import Dict, Optional, Any
 from pydantic import BaseModel, Field, field_validator
 
-from .enums import MessageType, CommitmentType
+from .enums import CommitmentStatus, CommitmentType, MessageType
+
+# cheap per-process message ordering, used instead of a wall clock timestamp
+_next_seq = count().__next__
 
 
 class Commitment(BaseModel):
@@ -14,8 +18,8 @@ class Commitment(BaseModel):
     adjustment_minutes: int = 0
     reciprocal_obligation: bool = False
     priority: int = 0
-    status: Literal["proposed", "accepted", "fulfilled", "violated"] = "proposed"
-    timestamp: datetime = datetime.now()
+    status: CommitmentStatus = CommitmentStatus.PROPOSED
+    timestamp: datetime = Field(default_factory=datetime.now)
 
     class Config:
         use_enum_values = True
@@ -28,7 +32,7 @@ class TrafficState(BaseModel):
         default_factory=dict
     )  # {agent_id: count}
     congestion_risk: float = 0.0  # normalized 0.0 - 1.0
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = Field(default_factory=datetime.now)
 
     @field_validator("congestion_risk")
     def clamp_risk(cls, v):
@@ -67,7 +71,7 @@ class ViolationReportContent(BaseModel):
     agent_id: str
     violation_count: int
     details: Optional[str] = None
-    timestamp: datetime = datetime.now()
+    timestamp: datetime = Field(default_factory=datetime.now)
 
 
 class Structure(BaseModel):
@@ -76,6 +80,10 @@ class Structure(BaseModel):
 
     Use `message_type` to indicate which of the optional fields is populated.
     Unused optional fields should be left None.
+
+    Agents assemble payloads from values they already own with `model_construct`, which skips
+    validation; enum fields are then passed as raw values, as `use_enum_values` would store them.
+    Data entering from outside the agents (e.g. traffic updates) goes through normal validation.
     """
 
     message_type: MessageType
@@ -93,14 +101,15 @@ class Structure(BaseModel):
     # violation reporting
     violation_report: Optional[ViolationReportContent] = None
 
-    created_at: datetime = datetime.now()
+    # messages are only ever ordered, never compared against wall clock time
+    seq: int = Field(default_factory=_next_seq)
 
     class Config:
         use_enum_values = True
         validate_by_name = True
         json_schema_extra = {
             "example": {
-                "message_type": "COMMITMENT_PROPOSAL",
+                "message_type": MessageType.COMMITMENT_PROPOSAL.value,
                 "sender": "C1",
                 "recipient": "BROADCAST",
                 "negotiation_id": "abc-123",
@@ -109,11 +118,11 @@ class Structure(BaseModel):
                         "id": "cmt-1",
                         "proposer": "C1",
                         "accepter": "OPEN",
-                        "commitment_type": "EARLY_EXIT",
+                        "commitment_type": CommitmentType.EARLY_EXIT.value,
                         "adjustment_minutes": 2,
                         "reciprocal_obligation": True,
                         "priority": 1,
-                        "status": "proposed",
+                        "status": CommitmentStatus.PROPOSED.value,
                     },
                     "negotiation_id": "abc-123",
                     "conditions": "Will finish 2 minutes early; seeking reciprocal favor",
@@ -0,0 +1,47 @@
+from typing import Callable, Dict
+
+from .enums import CommitmentType
+
+
+# pure scoring helpers on primitive values, shared by the classroom agents
+
+
+def obligation_factor(obligation_credits: int) -> float:
+    return max(0.5, min(1.5, 1.0 - 0.1 * obligation_credits))
+
+
+def adjustment_score(
+    flexibility: float,
+    minutes: int,
+    inv_max_adjustment: float,
+    obligation_multiplier: float,
+) -> float:
+    score = flexibility * (1.0 - abs(minutes) * inv_max_adjustment) * obligation_multiplier
+    return 0.0 if score < 0.0 else (1.0 if score > 1.0 else score)
+
+
+def _early_exit_benefit(attendance: int, obligation_credits: int) -> float:
+    return 0.6 if attendance > 30 else 0.3
+
+
+def _staggered_exit_benefit(attendance: int, obligation_credits: int) -> float:
+    return 0.4
+
+
+def _late_exit_benefit(attendance: int, obligation_credits: int) -> float:
+    return 0.5 if obligation_credits > 0 else 0.1
+
+
+# enum members hash like their values, so raw `commitment_type` values work as keys too
+_BENEFITS: Dict[CommitmentType, Callable[[int, int], float]] = {
+    CommitmentType.EARLY_EXIT: _early_exit_benefit,
+    CommitmentType.STAGGERED_EXIT: _staggered_exit_benefit,
+    CommitmentType.LATE_EXIT: _late_exit_benefit,
+}
+
+
+def proposal_benefit(
+    commitment_type: CommitmentType, attendance: int, obligation_credits: int
+) -> float:
+    benefit = _BENEFITS.get(commitment_type)
+    return benefit(attendance, obligation_credits) if benefit else 0.0
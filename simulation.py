@@ -1,26 +1,62 @@
+import asyncio
 import logging
-import time
+import logging.handlers
+import queue
 import random
-from datetime import datetime, timedelta
+from typing import Optional
+from collections import Counter
+from functools import lru_cache
 
 from mas.bottleneck_agent import BottleneckAgent
 from mas.classroom_agent import ClassroomAgent
 from mas.utils.message_broker import MessageBroker, Message
 from mas.utils.config import SystemConfig
 from mas.utils.message_structure import TrafficState, Structure
-from mas.utils.enums import MessageType
-from autogen_agentchat.messages import StructuredMessage
+from mas.utils.enums import CommitmentStatus, CommitmentType, MessageType
+
+
+# passed as `extra` on the last record of an episode, so buffered output is written per episode
+FLUSH_OUTPUT = {"flush_output": True}
+
+
+class EpisodeBufferHandler(logging.handlers.MemoryHandler):
+    """
+    Memory handler that also flushes on records logged with `extra=FLUSH_OUTPUT`
+    """
+
+    def shouldFlush(self, record: logging.LogRecord) -> bool:
+        return super().shouldFlush(record) or getattr(record, "flush_output", False)
+
+
+# the queue listener is created once per process, later `setup_logger` calls reuse it
+_listener: Optional[logging.handlers.QueueListener] = None
 
 
 def setup_logger():
+    """
+    Return the simulation logger and its queue listener, the caller starts and stops the listener
+    """
+    global _listener
     logger = logging.getLogger("MAS-Simulation")
+    if _listener is not None:
+        return logger, _listener
+
     logger.setLevel(logging.INFO)
     logger.handlers.clear()
     ch = logging.StreamHandler()
     ch.setLevel(logging.INFO)
     ch.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
-    logger.addHandler(ch)
-    return logger
+
+    # records are buffered and written once per episode, errors are written at once.
+    # flushing skips the target's level check, so the buffer filters by that level instead
+    buffered = EpisodeBufferHandler(capacity=1024, flushLevel=logging.ERROR, target=ch)
+    buffered.setLevel(ch.level)
+
+    # agents only enqueue records, the listener thread does formatting and I/O
+    log_queue = queue.SimpleQueue()
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    _listener = logging.handlers.QueueListener(log_queue, buffered, respect_handler_level=True)
+    return logger, _listener
 
 
 def calculate_congestion_risk(total_students: int, bottleneck_capacity: int, clearance_time: int) -> float:
@@ -41,203 +77,253 @@ def calculate_congestion_risk(total_students: int, bottleneck_capacity: int, cle
     return risk
 
 
-def main():
-    logger = setup_logger()
-    broker = MessageBroker()
+# schedules repeat across classrooms and episodes, and the result is an immutable string
+@lru_cache(maxsize=256)
+def format_exit_times(start_minute: int, step_minutes: int, count: int) -> str:
+    """
+    Format `count` exit times `step_minutes` apart from `start_minute` (minutes since midnight)
+    as "HH:MM, HH:MM, ..."
+    """
+    minutes = (start_minute + i * step_minutes for i in range(count))
+    return ", ".join(f"{minute // 60 % 24:02d}:{minute % 60:02d}" for minute in minutes)
+
+
+async def run_negotiation(agents, broker: MessageBroker, cycles: int = 5, realtime: bool = False):
+    # Run multiple negotiation cycles to allow for back-and-forth
+    for cycle in range(cycles):
+        # tasks start in list order, so the bottleneck agent (which starts negotiations) goes first
+        await asyncio.gather(*(agent._process_message_queue() for agent in agents))
+
+        # later cycles would only find empty queues
+        if broker.is_idle():
+            break
+
+        if realtime:
+            # Small delay to mimic message propagation
+            await asyncio.sleep(0.1)
+
+
+# Fixed: Use bottleneck_capacity that matches the BottleneckAgent's expectations
+DEFAULT_CONFIG = SystemConfig(
+    bottleneck_capacity=50,  # Changed from 12 to 50 - this is students per interval, not batches
+    clearance_time=2,
+    violation_limit=3,
+    max_adjustment=8,
+)
 
-    # Fixed: Use bottleneck_capacity that matches the BottleneckAgent's expectations
-    config = SystemConfig(
-        bottleneck_capacity=50,  # Changed from 12 to 50 - this is students per interval, not batches
-        clearance_time=2,
-        violation_limit=3,
-        max_adjustment=8,
-    )
+# (name, description, attendance, prof_flexibility)
+DEFAULT_CLASSROOMS = (
+    ("ClassroomA", "AI Lecture", 50, 0.8),
+    ("ClassroomB", "Math Lecture", 45, 0.7),
+    ("ClassroomC", "Physics Lecture", 40, 0.9),
+    ("ClassroomD", "Chemistry Lab", 35, 0.6),
+)
 
+
+def build_system(logger: logging.Logger, config: SystemConfig = DEFAULT_CONFIG, classrooms=DEFAULT_CLASSROOMS):
+    """
+    Create a message broker with a bottleneck agent and one classroom agent per `classrooms` entry
+    """
+    broker = MessageBroker()
     bottleneck = BottleneckAgent("Bottleneck", "Traffic monitor", broker, logger, config)
-    classrooms = [
-        ClassroomAgent("ClassroomA", "AI Lecture", broker, logger, attendance=50, prof_flexibility=0.8, config=config),
-        ClassroomAgent("ClassroomB", "Math Lecture", broker, logger, attendance=45, prof_flexibility=0.7, config=config),
-        ClassroomAgent("ClassroomC", "Physics Lecture", broker, logger, attendance=40, prof_flexibility=0.9, config=config),
-        ClassroomAgent("ClassroomD", "Chemistry Lab", broker, logger, attendance=35, prof_flexibility=0.6, config=config),
+    classroom_agents = [
+        ClassroomAgent(name, description, broker, logger, attendance=attendance, prof_flexibility=flexibility, config=config)
+        for name, description, attendance, flexibility in classrooms
     ]
+    return broker, bottleneck, classroom_agents
+
+
+def main():
+    logger, listener = setup_logger()
+    listener.start()
+    try:
+        run(logger)
+    finally:
+        # drains any queued records, then writes out whatever is still buffered
+        listener.stop()
+        for handler in listener.handlers:
+            handler.flush()
+
+
+def run(logger: logging.Logger, config: SystemConfig = DEFAULT_CONFIG, seed: Optional[int] = None):
+    broker, bottleneck, classrooms = build_system(logger, config)
 
     logger.info("=== Multi-Agent Traffic Coordination System ===")
-    logger.info(f"Bottleneck capacity: {config.bottleneck_capacity} students per {config.clearance_time}-minute interval")
+    logger.info("Bottleneck capacity: %d students per %d-minute interval", config.bottleneck_capacity, config.clearance_time)
 
     total_students = sum(c.state.current_attendance for c in classrooms)
     intervals_needed = (total_students + config.bottleneck_capacity - 1) // config.bottleneck_capacity
     time_needed = intervals_needed * config.clearance_time
-    logger.info(f"Initial situation: {total_students} total students")
-    logger.info(f"Without coordination: {intervals_needed} intervals needed, {time_needed} minutes total")
+    logger.info("Initial situation: %d total students", total_students)
+    logger.info("Without coordination: %d intervals needed, %d minutes total", intervals_needed, time_needed)
 
     for c in classrooms:
-        logger.info(f"  {c.name}: {c.state.current_attendance} students (flexibility: {c.state.prof_flexibility})")
+        logger.info("  %s: %d students (flexibility: %s)", c.name, c.state.current_attendance, c.state.prof_flexibility)
 
-    for episode in range(1, 4):
-        logger.info(f"\nEPISODE {episode}")
+    # the config is fixed for the whole run, so the episode loop reads plain locals
+    cap = config.bottleneck_capacity
+    ctime = config.clearance_time
+    # 6 intervals worth of capacity
+    window_capacity = cap * 6
 
-        # Add some variation in later episodes
-        if episode > 1:
-            for c in classrooms:
-                change = random.randint(-3, 5)
-                c.state.current_attendance = max(15, c.state.current_attendance + change)
-                logger.info(f"{c.name}: {c.state.current_attendance} students")
+    # running totals over fulfilled commitments, kept up to date where the exit schedule fulfills them
+    load_reduction = {c.name: 0 for c in classrooms}
+    fulfilled_adjustment = {c.name: 0 for c in classrooms}
+
+    # attendance variation of every later episode, drawn up front; a seed makes runs reproducible
+    rng = random.Random(seed) if seed is not None else random
+    fluctuations = [[rng.randint(-3, 5) for _ in classrooms] for _ in range(2, 4)]
+
+    for episode in range(1, 4):
+        logger.info("\nEPISODE %d", episode)
+        changes = fluctuations[episode - 2] if episode > 1 else None
 
         # Calculate current attendance considering past commitments
         classroom_attendance = {}
+        # bottleneck intervals each classroom needs, reused by the exit schedule and completion times
+        class_intervals = {}
         total_effective = 0
-        for c in classrooms:
+        for i, c in enumerate(classrooms):
+            # Add some variation in later episodes
+            if changes:
+                c.state.current_attendance = max(15, c.state.current_attendance + changes[i])
+                logger.info("%s: %d students", c.name, c.state.current_attendance)
+
             # Apply reductions from fulfilled early exit commitments
-            reduction = 0
-            for commitment in c.commitment_history:
-                if commitment.status == "fulfilled":
-                    if commitment.commitment_type == "EARLY_EXIT":
-                        # Early exit reduces effective load by allowing earlier processing
-                        reduction += commitment.adjustment_minutes // 2
-                    elif commitment.commitment_type == "STAGGERED_EXIT":
-                        # Staggered exit helps with flow management
-                        reduction += 5
-            
-            effective_count = max(10, c.state.current_attendance - reduction)
+            effective_count = max(10, c.state.current_attendance - load_reduction[c.name])
             classroom_attendance[c.name] = effective_count
+            class_intervals[c.name] = (effective_count + cap - 1) // cap
             total_effective += effective_count
 
         # Fixed: Use the same risk calculation as BottleneckAgent
-        congestion_risk = calculate_congestion_risk(total_effective, config.bottleneck_capacity, config.clearance_time)
+        congestion_risk = calculate_congestion_risk(total_effective, cap, ctime)
         
         traffic_state = TrafficState(
             current_flow=total_effective,
-            capacity_remaining=max(0, config.bottleneck_capacity * 6 - total_effective),  # 6 intervals worth of capacity
+            capacity_remaining=max(0, window_capacity - total_effective),
             estimated_students=classroom_attendance,
             congestion_risk=congestion_risk,
         )
         
-        logger.info(f"Total students: {total_effective}, Congestion risk: {congestion_risk:.2f}")
+        logger.info("Total students: %d, Congestion risk: %.2f", total_effective, congestion_risk)
 
         # Send traffic update to bottleneck agent
         update_struct = Structure(message_type=MessageType.TRAFFIC_UPDATE, traffic_state=traffic_state)
-        update_msg = StructuredMessage(content=update_struct, source="Simulation")
-        broker.send_message(Message(sender="Simulation", receiver="Bottleneck", content=update_msg))
+        broker.send_message(Message(sender="Simulation", receiver="Bottleneck", content=update_struct))
 
         # Process negotiation rounds
         logger.info("Negotiation phase started")
         commitments_before = sum(len(c.commitment_history) for c in classrooms)
 
-        # Run multiple negotiation cycles to allow for back-and-forth
-        for cycle in range(5):
-            # Process bottleneck agent first (it starts negotiations)
-            bottleneck._process_message_queue()
-            
-            # Then process all classroom agents
-            for classroom in classrooms:
-                classroom._process_message_queue()
-            
-            # Small delay to allow message propagation
-            time.sleep(0.1)
+        asyncio.run(run_negotiation([bottleneck, *classrooms], broker))
 
         commitments_after = sum(len(c.commitment_history) for c in classrooms)
         new_commitments = commitments_after - commitments_before
-        logger.info(f"Negotiation complete: {new_commitments} new commitments made")
+        logger.info("Negotiation complete: %d new commitments made", new_commitments)
 
         # Show commitment results
         logger.info("Commitment results:")
-        for c in classrooms:
-            recent_commitments = [cm for cm in c.commitment_history if cm.status in ["accepted", "proposed"]]
-            if recent_commitments:
-                for cm in recent_commitments[-2:]:  # Show last 2 commitments
-                    logger.info(f"  {c.name}: {cm.commitment_type} ({cm.adjustment_minutes} min) - {cm.status}")
-            else:
-                logger.info(f"  {c.name}: No recent commitments")
+        # the filtered histories are only needed for the log output
+        log_enabled = logger.isEnabledFor(logging.INFO)
+        if log_enabled:
+            for c in classrooms:
+                recent_commitments = [cm for cm in c.commitment_history if cm.status in (CommitmentStatus.ACCEPTED, CommitmentStatus.PROPOSED)]
+                if recent_commitments:
+                    for cm in recent_commitments[-2:]:  # Show last 2 commitments
+                        logger.info(
+                            "  %s: %s (%d min) - %s",
+                            c.name,
+                            CommitmentType(cm.commitment_type).name,
+                            cm.adjustment_minutes,
+                            CommitmentStatus(cm.status).name.lower(),
+                        )
+                else:
+                    logger.info("  %s: No recent commitments", c.name)
 
         # Calculate and show final exit schedule
         logger.info("Final exit schedule:")
-        base_time = datetime.now().replace(hour=12, minute=0, second=0)
+        # schedules are kept as minutes since midnight, classes end at 12:00
+        base_minute = 12 * 60
         
         for c in classrooms:
             time_adjustment = 0
+            reduction = 0
             staggered = False
             
             # Apply time adjustments from commitments
             for cm in c.commitment_history:
-                if cm.status == "accepted":
-                    if cm.commitment_type == "EARLY_EXIT":
+                if cm.status == CommitmentStatus.ACCEPTED:
+                    if cm.commitment_type == CommitmentType.EARLY_EXIT:
                         time_adjustment -= cm.adjustment_minutes
-                        cm.status = "fulfilled"  # Mark as fulfilled for next episode
-                    elif cm.commitment_type == "LATE_EXIT":
+                        # Early exit reduces effective load by allowing earlier processing
+                        reduction += cm.adjustment_minutes // 2
+                        cm.status = CommitmentStatus.FULFILLED.value  # Mark as fulfilled for next episode
+                    elif cm.commitment_type == CommitmentType.LATE_EXIT:
                         time_adjustment += cm.adjustment_minutes
-                        cm.status = "fulfilled"
-                    elif cm.commitment_type == "STAGGERED_EXIT":
+                        cm.status = CommitmentStatus.FULFILLED.value
+                    elif cm.commitment_type == CommitmentType.STAGGERED_EXIT:
                         staggered = True
-                        cm.status = "fulfilled"
+                        # Staggered exit helps with flow management
+                        reduction += 5
+                        cm.status = CommitmentStatus.FULFILLED.value
+
+            load_reduction[c.name] += reduction
+            fulfilled_adjustment[c.name] += time_adjustment
+            if not log_enabled:
+                continue
 
             students = classroom_attendance[c.name]
-            adjusted_end = base_time + timedelta(minutes=time_adjustment)
+            adjusted_end = base_minute + time_adjustment
             
             if staggered:
                 # Show staggered exit times
                 batch_size = min(30, students // 3)
-                exit_times = []
-                for i in range(0, students, batch_size):
-                    batch_time = adjusted_end + timedelta(minutes=(i // batch_size) * 2)
-                    exit_times.append(batch_time.strftime("%H:%M"))
-                logger.info(f"  {c.name}: Staggered exits at {', '.join(exit_times)} - {students} students")
+                exit_times = format_exit_times(adjusted_end, 2, -(-students // batch_size))
+                logger.info("  %s: Staggered exits at %s - %d students", c.name, exit_times, students)
             else:
                 # Calculate regular exit times based on bottleneck capacity
-                intervals_for_class = (students + config.bottleneck_capacity - 1) // config.bottleneck_capacity
-                exit_times = []
-                for i in range(intervals_for_class):
-                    interval_time = adjusted_end + timedelta(minutes=i * config.clearance_time)
-                    exit_times.append(interval_time.strftime("%H:%M"))
+                exit_times = format_exit_times(adjusted_end, ctime, class_intervals[c.name])
                 
-                logger.info(f"  {c.name}: Exit at {', '.join(exit_times)} ({time_adjustment:+d} min adjustment) - {students} students")
+                logger.info(
+                    "  %s: Exit at %s (%+d min adjustment) - %d students", c.name, exit_times, time_adjustment, students
+                )
 
         # Calculate time improvement
-        original_intervals = (total_effective + config.bottleneck_capacity - 1) // config.bottleneck_capacity
-        original_time = original_intervals * config.clearance_time
+        original_intervals = (total_effective + cap - 1) // cap
+        original_time = original_intervals * ctime
         
         # Calculate actual time needed after commitments
-        all_completion_times = []
-        for c in classrooms:
-            time_adj = 0
-            for cm in c.commitment_history:
-                if cm.status == "fulfilled":
-                    if cm.commitment_type == "EARLY_EXIT":
-                        time_adj -= cm.adjustment_minutes
-                    elif cm.commitment_type == "LATE_EXIT":
-                        time_adj += cm.adjustment_minutes
-            
-            students = classroom_attendance[c.name]
-            intervals_needed = (students + config.bottleneck_capacity - 1) // config.bottleneck_capacity
-            completion_time = (intervals_needed * config.clearance_time) + time_adj
-            all_completion_times.append(completion_time)
-
-        actual_time = max(all_completion_times) if all_completion_times else original_time
+        actual_time = max(
+            (class_intervals[name] * ctime + adjustment for name, adjustment in fulfilled_adjustment.items()),
+            default=original_time,
+        )
         improvement = max(0, original_time - actual_time)
 
-        logger.info(f"\nEpisode {episode} summary:")
-        logger.info(f"  Total students: {total_effective}")
-        logger.info(f"  Congestion risk: {congestion_risk:.2f}")
-        logger.info(f"  Time without coordination: {original_time} minutes")
-        logger.info(f"  Time with coordination: {actual_time} minutes")
-        logger.info(f"  Improvement: {improvement} minutes saved")
-        logger.info(f"  New commitments this episode: {new_commitments}")
+        logger.info("\nEpisode %d summary:", episode)
+        logger.info("  Total students: %d", total_effective)
+        logger.info("  Congestion risk: %.2f", congestion_risk)
+        logger.info("  Time without coordination: %d minutes", original_time)
+        logger.info("  Time with coordination: %d minutes", actual_time)
+        logger.info("  Improvement: %d minutes saved", improvement)
+        logger.info("  New commitments this episode: %d", new_commitments, extra=FLUSH_OUTPUT)
 
     # Final statistics
     logger.info("\n=== FINAL STATISTICS ===")
     for c in classrooms:
         total_commitments = len(c.commitment_history)
-        fulfilled = len([cm for cm in c.commitment_history if cm.status == "fulfilled"])
-        violated = len([cm for cm in c.commitment_history if cm.status == "violated"])
+        statuses = Counter(cm.status for cm in c.commitment_history)
+        fulfilled = statuses[CommitmentStatus.FULFILLED]
+        violated = statuses[CommitmentStatus.VIOLATED]
         reliability = (fulfilled / (total_commitments or 1)) * 100
         
-        logger.info(f"{c.name}:")
-        logger.info(f"  Total commitments: {total_commitments}")
-        logger.info(f"  Fulfilled: {fulfilled}, Violated: {violated}")
-        logger.info(f"  Reliability: {reliability:.1f}%")
-        logger.info(f"  Final attendance: {c.state.current_attendance}")
-        logger.info(f"  Obligation credits: {c.obligation_credits}")
-
-    logger.info("\nSimulation completed successfully!")
+        logger.info("%s:", c.name)
+        logger.info("  Total commitments: %d", total_commitments)
+        logger.info("  Fulfilled: %d, Violated: %d", fulfilled, violated)
+        logger.info("  Reliability: %.1f%%", reliability)
+        logger.info("  Final attendance: %d", c.state.current_attendance)
+        logger.info("  Obligation credits: %d", c.obligation_credits)
+
+    logger.info("\nSimulation completed successfully!", extra=FLUSH_OUTPUT)
 
 
 if __name__ == "__main__":